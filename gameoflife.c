@@ -0,0 +1,303 @@
+/* The Game of Life, the inner step for gameoflife.py.
+ *
+ * Build with:
+ *   cc -O3 -shared -fPIC -o libgameoflife.so gameoflife.c
+ *
+ * Boards are height rows of width uint8 cells, 1 for live and 0 for dead.
+ * Since neighbor counts fit in a byte, 16 (SSE2) or 32 (AVX2) cells are
+ * counted per vector with plain byte additions of shifted loads. The vector
+ * width is picked once when the library is loaded.
+ */
+#include <stdint.h>
+#include <stdlib.h>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define GAMEOFLIFE_X86 1
+#endif
+
+/* Update the interior cells of a row starting from column 1, return the first
+ * column that was not updated. */
+typedef int (*row_kernel)(const uint8_t *above, const uint8_t *row,
+                          const uint8_t *below, uint8_t *out, int width);
+
+static int row_scalar(const uint8_t *above, const uint8_t *row,
+                      const uint8_t *below, uint8_t *out, int width) {
+    (void)above, (void)row, (void)below, (void)out, (void)width;
+    return 1;
+}
+
+#ifdef GAMEOFLIFE_X86
+__attribute__((target("sse2"))) static int
+row_sse2(const uint8_t *above, const uint8_t *row, const uint8_t *below,
+         uint8_t *out, int width) {
+    const __m128i one = _mm_set1_epi8(1);
+    const __m128i two = _mm_set1_epi8(2);
+    const __m128i three = _mm_set1_epi8(3);
+    int x = 1;
+    /* Loads reach column x + 16, which must be inside the row */
+    for (; x + 17 <= width; x += 16) {
+#define LOAD(p) _mm_loadu_si128((const __m128i *)(p))
+        __m128i n = _mm_add_epi8(LOAD(above + x - 1), LOAD(above + x));
+        n = _mm_add_epi8(n, LOAD(above + x + 1));
+        n = _mm_add_epi8(n, LOAD(row + x - 1));
+        n = _mm_add_epi8(n, LOAD(row + x + 1));
+        n = _mm_add_epi8(n, LOAD(below + x - 1));
+        n = _mm_add_epi8(n, LOAD(below + x));
+        n = _mm_add_epi8(n, LOAD(below + x + 1));
+        __m128i cell = LOAD(row + x);
+#undef LOAD
+        /* Select live cells without branching: n == 3, or n == 2 and alive */
+        __m128i born = _mm_and_si128(_mm_cmpeq_epi8(n, three), one);
+        __m128i stay = _mm_and_si128(_mm_cmpeq_epi8(n, two), cell);
+        _mm_storeu_si128((__m128i *)(out + x), _mm_or_si128(born, stay));
+    }
+    return x;
+}
+
+__attribute__((target("avx2"))) static int
+row_avx2(const uint8_t *above, const uint8_t *row, const uint8_t *below,
+         uint8_t *out, int width) {
+    const __m256i one = _mm256_set1_epi8(1);
+    const __m256i two = _mm256_set1_epi8(2);
+    const __m256i three = _mm256_set1_epi8(3);
+    int x = 1;
+    for (; x + 33 <= width; x += 32) {
+#define LOAD(p) _mm256_loadu_si256((const __m256i *)(p))
+        __m256i n = _mm256_add_epi8(LOAD(above + x - 1), LOAD(above + x));
+        n = _mm256_add_epi8(n, LOAD(above + x + 1));
+        n = _mm256_add_epi8(n, LOAD(row + x - 1));
+        n = _mm256_add_epi8(n, LOAD(row + x + 1));
+        n = _mm256_add_epi8(n, LOAD(below + x - 1));
+        n = _mm256_add_epi8(n, LOAD(below + x));
+        n = _mm256_add_epi8(n, LOAD(below + x + 1));
+        __m256i cell = LOAD(row + x);
+#undef LOAD
+        __m256i born = _mm256_and_si256(_mm256_cmpeq_epi8(n, three), one);
+        __m256i stay = _mm256_and_si256(_mm256_cmpeq_epi8(n, two), cell);
+        _mm256_storeu_si256((__m256i *)(out + x), _mm256_or_si256(born, stay));
+    }
+    /* Finish with 16 cells at a time */
+    return x + row_sse2(above + x - 1, row + x - 1, below + x - 1, out + x - 1,
+                        width - x + 1) - 1;
+}
+#endif
+
+static row_kernel update_row = row_scalar;
+
+__attribute__((constructor)) static void pick_row_kernel(void) {
+#ifdef GAMEOFLIFE_X86
+    __builtin_cpu_init();
+    update_row = __builtin_cpu_supports("avx2") ? row_avx2 : row_sse2;
+#endif
+}
+
+static uint8_t update_cell(const uint8_t *above, const uint8_t *row,
+                           const uint8_t *below, int x, int width, int wrap) {
+    int n = -row[x];
+    for (int dx = -1; dx <= 1; dx++) {
+        int xx = x + dx;
+        if (wrap) {
+            xx = (xx + width) % width;
+        } else if (xx < 0 || xx >= width) {
+            continue;
+        }
+        n += above[xx] + row[xx] + below[xx];
+    }
+    return n == 3 || (n == 2 && row[x]);
+}
+
+/* Write the next generation of in to out. With wrap the board is a sphere,
+ * otherwise cells outside the board are dead. Returns -1 if out of memory. */
+int update_u8(const uint8_t *in, uint8_t *out, int width, int height,
+              int wrap) {
+    uint8_t *blank = calloc(width, 1);
+    if (blank == NULL) {
+        return -1;
+    }
+    for (int y = 0; y < height; y++) {
+        const uint8_t *row = in + (size_t)y * width;
+        const uint8_t *above = in + (size_t)((y + height - 1) % height) * width;
+        const uint8_t *below = in + (size_t)((y + 1) % height) * width;
+        if (!wrap && y == 0) {
+            above = blank;
+        }
+        if (!wrap && y == height - 1) {
+            below = blank;
+        }
+        uint8_t *out_row = out + (size_t)y * width;
+        int x = update_row(above, row, below, out_row, width);
+        for (; x < width - 1; x++) {
+            out_row[x] = update_cell(above, row, below, x, width, wrap);
+        }
+        out_row[0] = update_cell(above, row, below, 0, width, wrap);
+        out_row[width - 1] =
+            update_cell(above, row, below, width - 1, width, wrap);
+    }
+    free(blank);
+    return 0;
+}
+
+/* Bit-packed boards: each row is (width + 63) / 64 words and column x is bit
+ * x % 64 of word x / 64. The eight neighbor words are added with a tree of
+ * half and full adders into the bit-planes s0..s3 of the neighbor count, so
+ * every bitwise operation updates 64 cells (256 with AVX2). */
+#define HADD(s, c, a, b, XOR, AND)                                             \
+    do {                                                                       \
+        s = XOR(a, b);                                                         \
+        c = AND(a, b);                                                         \
+    } while (0)
+#define FADD(TYPE, s, c, a, b, d, XOR, AND, OR)                                \
+    do {                                                                       \
+        TYPE t_ = XOR(a, b);                                                   \
+        s = XOR(t_, d);                                                        \
+        c = OR(AND(a, b), AND(t_, d));                                         \
+    } while (0)
+/* Three neighbors, or two neighbors and alive */
+#define LIFE_BITS(TYPE, out, cell, n, s, e, w, ne, nw, se, sw, XOR, AND, OR,   \
+                  ANDNOT)                                                      \
+    do {                                                                       \
+        TYPE sum_a, carry_a, sum_b, carry_b, sum_c, carry_c;                   \
+        TYPE s0, carry_d, twos, carry_e, s1, carry_f, s2, s3;                  \
+        FADD(TYPE, sum_a, carry_a, n, s, e, XOR, AND, OR);                     \
+        FADD(TYPE, sum_b, carry_b, w, ne, nw, XOR, AND, OR);                   \
+        HADD(sum_c, carry_c, se, sw, XOR, AND);                                \
+        FADD(TYPE, s0, carry_d, sum_a, sum_b, sum_c, XOR, AND, OR);            \
+        FADD(TYPE, twos, carry_e, carry_a, carry_b, carry_c, XOR, AND, OR);    \
+        HADD(s1, carry_f, twos, carry_d, XOR, AND);                            \
+        HADD(s2, s3, carry_e, carry_f, XOR, AND);                              \
+        out = ANDNOT(s3, ANDNOT(s2, AND(s1, OR(s0, cell))));                   \
+    } while (0)
+
+#define XOR64(a, b) ((a) ^ (b))
+#define AND64(a, b) ((a) & (b))
+#define OR64(a, b) ((a) | (b))
+#define ANDNOT64(a, b) (~(a) & (b))
+
+static uint64_t west_word(const uint64_t *r, int k, int words, int edge,
+                          int wrap) {
+    uint64_t west = r[k] << 1;
+    if (k > 0) {
+        west |= r[k - 1] >> 63;
+    } else if (wrap) {
+        west |= (r[words - 1] >> edge) & 1;
+    }
+    return west;
+}
+
+static uint64_t east_word(const uint64_t *r, int k, int words, int edge,
+                          int wrap) {
+    uint64_t east = r[k] >> 1;
+    if (k < words - 1) {
+        east |= r[k + 1] << 63;
+    } else if (wrap) {
+        east |= (r[0] & 1) << edge;
+    }
+    return east;
+}
+
+static uint64_t update_word(const uint64_t *above, const uint64_t *row,
+                            const uint64_t *below, int k, int words, int edge,
+                            int wrap) {
+    uint64_t out;
+    LIFE_BITS(uint64_t, out, row[k], above[k], below[k],
+              east_word(row, k, words, edge, wrap),
+              west_word(row, k, words, edge, wrap),
+              east_word(above, k, words, edge, wrap),
+              west_word(above, k, words, edge, wrap),
+              east_word(below, k, words, edge, wrap),
+              west_word(below, k, words, edge, wrap), XOR64, AND64, OR64,
+              ANDNOT64);
+    return out;
+}
+
+/* Update the interior words of a row starting from word 1, return the first
+ * word that was not updated. */
+typedef int (*words_kernel)(const uint64_t *above, const uint64_t *row,
+                            const uint64_t *below, uint64_t *out, int words);
+
+static int words_scalar(const uint64_t *above, const uint64_t *row,
+                        const uint64_t *below, uint64_t *out, int words) {
+    (void)above, (void)row, (void)below, (void)out, (void)words;
+    return 1;
+}
+
+#ifdef GAMEOFLIFE_X86
+__attribute__((target("avx2"))) static int
+words_avx2(const uint64_t *above, const uint64_t *row, const uint64_t *below,
+           uint64_t *out, int words) {
+#define LOAD(p) _mm256_loadu_si256((const __m256i *)(p))
+/* West and east neighbors of the four words at p, carrying across words */
+#define WEST(p)                                                                \
+    _mm256_or_si256(_mm256_slli_epi64(LOAD(p), 1),                             \
+                    _mm256_srli_epi64(LOAD((p) - 1), 63))
+#define EAST(p)                                                                \
+    _mm256_or_si256(_mm256_srli_epi64(LOAD(p), 1),                             \
+                    _mm256_slli_epi64(LOAD((p) + 1), 63))
+    int k = 1;
+    /* Loads reach word k + 4, which must be inside the row */
+    for (; k + 5 <= words; k += 4) {
+        __m256i next;
+        LIFE_BITS(__m256i, next, LOAD(row + k), LOAD(above + k),
+                  LOAD(below + k), EAST(row + k), WEST(row + k),
+                  EAST(above + k), WEST(above + k), EAST(below + k),
+                  WEST(below + k),
+                  _mm256_xor_si256, _mm256_and_si256, _mm256_or_si256,
+                  _mm256_andnot_si256);
+        _mm256_storeu_si256((__m256i *)(out + k), next);
+    }
+#undef EAST
+#undef WEST
+#undef LOAD
+    return k;
+}
+#endif
+
+static words_kernel update_words = words_scalar;
+
+__attribute__((constructor)) static void pick_words_kernel(void) {
+#ifdef GAMEOFLIFE_X86
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx2")) {
+        update_words = words_avx2;
+    }
+#endif
+}
+
+/* Write the next generation of the packed board in to out, like update_u8.
+ * Bits past width in the last word of each row must be 0. */
+int update_bits_u64(const uint64_t *in, uint64_t *out, int width, int height,
+                    int wrap) {
+    int words = (width + 63) / 64;
+    int edge = (width - 1) % 64;
+    uint64_t mask = ~(uint64_t)0;
+    if (width % 64) {
+        mask = ((uint64_t)1 << (width % 64)) - 1;
+    }
+    uint64_t *blank = calloc(words, sizeof(uint64_t));
+    if (blank == NULL) {
+        return -1;
+    }
+    for (int y = 0; y < height; y++) {
+        const uint64_t *row = in + (size_t)y * words;
+        const uint64_t *above =
+            in + (size_t)((y + height - 1) % height) * words;
+        const uint64_t *below = in + (size_t)((y + 1) % height) * words;
+        if (!wrap && y == 0) {
+            above = blank;
+        }
+        if (!wrap && y == height - 1) {
+            below = blank;
+        }
+        uint64_t *out_row = out + (size_t)y * words;
+        int k = update_words(above, row, below, out_row, words);
+        for (; k < words - 1; k++) {
+            out_row[k] = update_word(above, row, below, k, words, edge, wrap);
+        }
+        out_row[0] = update_word(above, row, below, 0, words, edge, wrap);
+        out_row[words - 1] =
+            update_word(above, row, below, words - 1, words, edge, wrap) & mask;
+    }
+    free(blank);
+    return 0;
+}
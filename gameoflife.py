@@ -2,18 +2,44 @@
 """The Game of Life."""
 import abc
 import argparse
+import collections
+import ctypes
+import importlib.util
 import os
 import string
 import subprocess
 import sys
 import time
-from typing import Callable, Literal, Optional, TypedDict
+import zlib
+from functools import lru_cache
+from operator import or_
+from typing import TYPE_CHECKING, Callable, Literal, Optional, TypedDict, Union
+
+try:
+    import numpy as np
+except ImportError:  # Fall back to lists of lists
+    np = None  # type: ignore
+
+try:
+    import numba
+
+    prange = numba.prange
+except ImportError:
+    numba = None  # type: ignore
+    prange = range  # type: ignore
+
+if TYPE_CHECKING:
+    import hashlife as hashlife_module
 
 # pylint: disable=missing-class-docstring, missing-function-docstring, invalid-name
 
 Cell = bool
 Row = list[bool]
-Board = list[list[bool]]
+ListBoard = list[list[bool]]
+# A 2-D numpy.uint8 array when numpy is installed, otherwise a list of lists
+Board = Union[ListBoard, "np.ndarray"]
+# The coordinates (y, x) of the live cells
+Cells = set[tuple[int, int]]
 Surface = Literal["sphere", "rectangle", "infinite", "torus", "?"]
 
 LIVE = True
@@ -21,6 +47,12 @@ DEAD = False
 L = LIVE
 D = DEAD
 
+# Built from gameoflife.c, see install.sh
+LIBRARY = os.path.join(os.path.dirname(os.path.realpath(__file__)), "libgameoflife.so")
+
+# Ends each board sent to and from external workers
+FRAME_END = "---"
+
 LIVE_STR = "# "
 DEAD_STR = "  "
 LIVE_STR_PRETTY = "█▒"
@@ -43,12 +75,39 @@ def empty_row() -> Row:
 
 surfaces: list[Surface] = ["sphere", "rectangle", "infinite", "torus", "?"]
 
+# Below this fraction of live cells the pure Python updater only visits live cells
+SPARSE_FRACTION = 0.05
+
+# Look for repeats among this many recent boards, or fewer for big boards, and
+# remember the next board of those that repeated in up to MEMO_BYTES bytes
+MEMO_SIZE = 64
+MEMO_BYTES = 1 << 25
+
+# Forget the rows seen by the pure Python updater after this many boards, or
+# sooner once they hold MEMO_BYTES bytes
+ROW_CACHE_BOARDS = 256
 
-def ix(row: Row, x: int, default=DEAD) -> Cell:
-    return row[x] if 0 <= x < len(row) else default
+# The NumPy updater adds up the neighbors of boards of more than this many cells
+# in bands of about this many cells at a time
+NUMPY_BAND_CELLS = 1 << 18
+
+# Surfaces as integers for the compiled kernels, anything else has dead edges
+SURFACE_CODES: dict[Surface, int] = {"sphere": 0, "rectangle": 1}
+
+NEIGHBOR_OFFSETS = [
+    (dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)
+]
+
+
+def copy(board: Board) -> Board:
+    if not isinstance(board, list):
+        return board.copy()
+    return [row.copy() for row in board]
 
 
 def empty(width: int, height: int) -> Board:
+    if np is not None:
+        return np.zeros((height, width), dtype=np.uint8)
     return [[DEAD for _ in range(width)] for _ in range(height)]
 
 
@@ -63,126 +122,789 @@ def glider(up: bool, left: bool) -> Board:
     if not left:
         for row in out:
             row.reverse()
+    if np is not None:
+        return np.array(out, dtype=np.uint8)
     return out
 
 
-def add(board: Board, other: Board, operator=bool.__or__) -> Board:
+def add(board: Board, other: Board, operator=or_) -> Board:
+    if not isinstance(board, list):
+        assert not isinstance(other, list), "boards are all arrays or all lists"
+        height = min(board.shape[0], other.shape[0])
+        width = min(board.shape[1], other.shape[1])
+        new_board = board.copy()
+        new_board[:height, :width] = operator(
+            board[:height, :width], other[:height, :width]
+        )
+        return new_board
     new = []
     for y, row in enumerate(board):
-        new_row = empty_row()
         other_row = other[y] if y < len(other) else empty_row()
-        for x, cell in enumerate(row):
-            new_row.append(operator(cell, ix(other_row, x)))
-        new.append(new_row)
+        # Cells past the end of the other row are dead
+        padding = [DEAD] * (len(row) - len(other_row))
+        new.append(list(map(operator, row, other_row + padding)))
     return new
 
 
 def shift(board: Board, y: int = 0, x: int = 0) -> Board:
-    for _ in range(abs(y)):
-        if y > 0:
-            board.insert(0, [DEAD for _ in range(len(board[0]))])
-        if y < 0:
-            board.append([DEAD for _ in range(len(board[-1]))])
-    for row in board:
-        for _ in range(x):
-            if x > 0:
-                row.insert(0, DEAD)
-            if x < 0:
-                row.append(DEAD)
-    return board
+    if not isinstance(board, list):
+        return np.pad(board, ((max(y, 0), max(-y, 0)), (max(x, 0), max(-x, 0))))
+    if board and y > 0:
+        board = [[DEAD] * len(board[0]) for _ in range(y)] + board
+    if board and y < 0:
+        board = board + [[DEAD] * len(board[-1]) for _ in range(-y)]
+    return [[DEAD] * max(x, 0) + row + [DEAD] * max(-x, 0) for row in board]
 
 
-def neighbors(x: int, row: Row, prev_row: Row, next_row: Row, surface: Surface) -> int:
-    """Count living neighbors diagonally, horizontally, and vertically."""
-    if surface == "sphere":
-        return [
-            # Wrap around to end of row
-            ix(row, x - 1, row[-1]),
-            # Wrap around to beginning of row
-            ix(row, x + 1, row[0]),
-            # Next: wrap around diagonal if at beginning or end
-            ix(next_row, x - 1, next_row[-1]),
-            # This next_row is always a valid row, handled by the parent function
-            ix(next_row, x),
-            ix(next_row, x + 1, next_row[0]),
-            # Previous: wrap around diagonal if at beginning or end
-            ix(prev_row, x - 1, prev_row[-1]),
-            # This prev_row is always a valid row, handled by the parent function
-            ix(prev_row, x),
-            ix(prev_row, x + 1, prev_row[0]),
-        ].count(LIVE)
-    return [
-        ix(row, x - 1),
-        ix(row, x + 1),
-        ix(next_row, x - 1),
-        ix(next_row, x),
-        ix(next_row, x + 1),
-        ix(prev_row, x - 1),
-        ix(prev_row, x),
-        ix(prev_row, x + 1),
-    ].count(LIVE)
-
-
-def update(board: Board, surface: Surface) -> Board:
-    new_board = []
-    prev_row = empty_row()
-    if surface == "sphere":
-        prev_row = board[-1]
-    for y, row in enumerate(board):
-        next_row = board[y + 1] if 0 <= y + 1 < len(board) else empty_row()
-        if surface == "sphere" and y + 1 == len(board):
-            next_row = board[0]
-        new_row = empty_row()
-        for x, cell in enumerate(row):
-            neighbor_count = neighbors(x, row, prev_row, next_row, surface)
-            new_row.append(
-                LIVE if neighbor_count == 3 else cell if neighbor_count == 2 else DEAD
+def life_rule_3x3(bits: int) -> Cell:
+    """The next state of the center cell of a 3x3 square.
+
+    Cell (y, x) of the square is bit 8 - 3 * x - y, so each column is three bits.
+    """
+    neighbor_count = (bits & ~(1 << 4)).bit_count()
+    center = bits >> 4 & 1
+    return LIVE if neighbor_count == 3 or neighbor_count == 2 and center else DEAD
+
+
+LIFE_RULE_3X3 = [life_rule_3x3(bits) for bits in range(1 << 9)]
+
+
+def update_numpy(
+    board_in: "np.ndarray", board_out: "np.ndarray", surface: Surface
+) -> None:
+    """Apply the rules to the whole board or bands of rows using shifted copies.
+
+    Bands of NUMPY_BAND_CELLS cells stay in the cache while their eight
+    neighbors are added up, where a whole large board would not. Smaller boards
+    are faster in one pass.
+    """
+    height, width = board_in.shape
+    # The cells on the other side of a sphere, otherwise cells outside are dead
+    padded = np.pad(board_in, 1, mode="wrap" if surface == "sphere" else "constant")
+    if board_in.size <= NUMPY_BAND_CELLS:
+        band = max(height, 1)
+    else:
+        band = max(1, NUMPY_BAND_CELLS // width)
+    counts = np.empty((min(band, height), width), dtype=np.uint8)
+    for top in range(0, height, band):
+        bottom = min(top + band, height)
+        neighbor_count = counts[: bottom - top]
+        neighbor_count.fill(0)
+        for dy, dx in NEIGHBOR_OFFSETS:
+            neighbor_count += padded[
+                1 + top + dy : 1 + bottom + dy, 1 + dx : 1 + dx + width
+            ]
+        board_out[top:bottom] = (neighbor_count == 3) | (
+            (neighbor_count == 2) & board_in[top:bottom]
+        )
+
+
+def update_kernel(
+    board_in: "np.ndarray", board_out: "np.ndarray", surface_code: int
+) -> None:
+    """Apply the rules cell by cell, one row per thread. Compiled with numba."""
+    height, width = board_in.shape
+    wrap = surface_code == 0  # sphere
+    blank = np.zeros(width, dtype=board_in.dtype)
+    for row in prange(height):
+        y = np.int64(row)
+        above = board_in[(y - 1) % height] if wrap or y > 0 else blank
+        below = board_in[(y + 1) % height] if wrap or y + 1 < height else blank
+        current = board_in[y]
+        out = board_out[y]
+        # Interior cells, branchless so that LLVM can vectorize the loop
+        for x in range(1, width - 1):
+            neighbor_count = (
+                above[x - 1]
+                + above[x]
+                + above[x + 1]
+                + current[x - 1]
+                + current[x + 1]
+                + below[x - 1]
+                + below[x]
+                + below[x + 1]
             )
-        new_board.append(new_row)
-        prev_row = row
-    return new_board
+            out[x] = (neighbor_count == 3) | ((neighbor_count == 2) & (current[x] != 0))
+        for x in (0, width - 1):
+            neighbor_count = 0
+            for dx in (-1, 0, 1):
+                xx = x + dx
+                if wrap:
+                    xx %= width
+                if 0 <= xx < width:
+                    neighbor_count += above[xx] + current[xx] + below[xx]
+            neighbor_count -= current[x]
+            out[x] = (neighbor_count == 3) | ((neighbor_count == 2) & (current[x] != 0))
+
+
+if numba is not None:
+    update_kernel = numba.njit(cache=True, parallel=True, boundscheck=False)(
+        update_kernel
+    )
+
+
+def load_library(path: str = LIBRARY) -> Optional[ctypes.CDLL]:
+    if np is None or not os.path.exists(path):
+        return None
+    library = ctypes.CDLL(path)
+    library.update_u8.argtypes = [ctypes.c_void_p] * 2 + [ctypes.c_int] * 3
+    library.update_u8.restype = ctypes.c_int
+    library.update_bits_u64.argtypes = [ctypes.c_void_p] * 2 + [ctypes.c_int] * 3
+    library.update_bits_u64.restype = ctypes.c_int
+    return library
+
+
+libgameoflife = load_library()
+
+
+class RowCache:
+    """The next generation of rows of list boards, by the rows around them."""
+
+    def __init__(self) -> None:
+        # Every row seen, numbered
+        self.ids: dict[tuple[Cell, ...], int] = {}
+        # The next generation of the middle one of three rows, by their numbers
+        self.next_rows: dict[tuple[int, int, int], Row] = {}
+
+
+def update_row(above: Row, row: Row, below: Row, new_row: Row, wrap: bool) -> None:
+    """Write the next generation of row into new_row.
+
+    The rows are followed by a dead cell, past the end of a rectangle.
+    """
+    width = len(new_row)
+    # Each column of three cells as three bits, see life_rule_3x3
+    columns = [
+        cell_above << 2 | cell << 1 | cell_below
+        for cell_above, cell, cell_below in zip(above, row, below)
+    ]
+    if wrap:
+        # The columns past either end are the columns at the other end
+        west, columns[width] = columns[width - 1], columns[0]
+    else:
+        west = DEAD
+    rule = LIFE_RULE_3X3
+    # Slide a window of three columns along the row
+    window = west << 3 | columns[0]
+    for x, east in enumerate(columns[1:]):
+        window = (window << 3 & 0o777) | east
+        new_row[x] = rule[window]
+
+
+def update(
+    board_in: Board,
+    board_out: Board,
+    surface: Surface,
+    row_cache: Optional[RowCache] = None,
+) -> None:
+    """Write the next generation of board_in into board_out, of the same size.
+
+    List boards copy the rows found in row_cache instead of computing them again.
+    """
+    if not isinstance(board_in, list):
+        assert not isinstance(board_out, list), "boards are all arrays or all lists"
+        if (
+            libgameoflife is not None
+            and board_in.dtype == board_out.dtype == np.uint8
+            and board_in.flags.c_contiguous
+            and board_out.flags.c_contiguous
+        ):
+            height, width = board_in.shape
+            status = libgameoflife.update_u8(
+                board_in.ctypes.data,
+                board_out.ctypes.data,
+                width,
+                height,
+                surface == "sphere",
+            )
+            if status != 0:
+                raise MemoryError("libgameoflife could not allocate a row")
+        elif numba is not None:
+            update_kernel(board_in, board_out, SURFACE_CODES.get(surface, 1))
+        else:
+            update_numpy(board_in, board_out, surface)
+        return
+    height = len(board_in)
+    width = len(board_in[0]) if board_in else 0
+    if not width:
+        return
+    wrap = surface == "sphere"
+    # A dead cell after each row and a dead row after the board, so that the
+    # neighbors past the edges of a rectangle are at index -1 or the width
+    rows = [row + [DEAD] for row in board_in] + [[DEAD] * (width + 1)]
+    # The neighboring rows of each row, found only once
+    if wrap:
+        up = [(y - 1) % height for y in range(height)]
+        down = [(y + 1) % height for y in range(height)]
+    else:
+        up, down = list(range(-1, height - 1)), list(range(1, height + 1))
+    if row_cache is None:
+        for y, new_row in enumerate(board_out):
+            update_row(rows[up[y]], rows[y], rows[down[y]], new_row, wrap)
+        return
+    ids = [row_cache.ids.setdefault(tuple(row), len(row_cache.ids)) for row in rows]
+    for y, new_row in enumerate(board_out):
+        key = (ids[up[y]], ids[y], ids[down[y]])
+        next_row = row_cache.next_rows.get(key)
+        if next_row is None:
+            update_row(rows[up[y]], rows[y], rows[down[y]], new_row, wrap)
+            row_cache.next_rows[key] = new_row.copy()
+        else:
+            new_row[:] = next_row
+
+
+def pack(board: "np.ndarray") -> "np.ndarray":
+    """Pack each row into 64-bit words, column x is bit x % 64 of word x // 64."""
+    height, width = board.shape
+    padded = np.zeros((height, -(-width // 64) * 64), dtype=np.uint8)
+    padded[:, :width] = board
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def unpack(rows: "np.ndarray", width: int) -> "np.ndarray":
+    as_bytes = rows.astype("<u8", copy=False).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=width, bitorder="little")
+
+
+def last_word_mask(width: int) -> "np.uint64":
+    if width % 64 == 0:
+        return ~np.uint64(0)
+    return (np.uint64(1) << np.uint64(width % 64)) - np.uint64(1)
+
+
+def hadd(a, b):
+    """Half adder on every bit, returns the sum and the carry."""
+    return a ^ b, a & b
+
+
+def fadd(a, b, c):
+    """Full adder on every bit, returns the sum and the carry."""
+    t = a ^ b
+    return t ^ c, (a & b) | (t & c)
+
+
+def life_bits(cell, n, s, e, w, ne, nw, se, sw):
+    """Apply the rules to every bit of cell given the same bit of its neighbors."""
+    # Carry-save adder tree, the neighbor count is s0 + 2 * s1 + 4 * s2 + 8 * s3
+    sum_a, carry_a = fadd(n, s, e)
+    sum_b, carry_b = fadd(w, ne, nw)
+    sum_c, carry_c = hadd(se, sw)
+    s0, carry_d = fadd(sum_a, sum_b, sum_c)
+    twos, carry_e = fadd(carry_a, carry_b, carry_c)
+    s1, carry_f = hadd(twos, carry_d)
+    s2, s3 = hadd(carry_e, carry_f)
+    # Three neighbors, or two neighbors and alive
+    return s1 & ~s2 & ~s3 & (s0 | cell)
+
+
+def shift_rows(rows: "np.ndarray", dy: int, wrap: bool) -> "np.ndarray":
+    """Row y of the output is row y + dy, for dy of -1 or 1."""
+    if wrap:
+        return np.roll(rows, -dy, axis=0)
+    shifted = np.zeros_like(rows)
+    if dy < 0:
+        shifted[1:] = rows[:-1]
+    else:
+        shifted[:-1] = rows[1:]
+    return shifted
+
+
+def update_bits_numpy(rows: "np.ndarray", width: int, wrap: bool) -> "np.ndarray":
+    """Apply the rules to a packed board, 64 cells per bitwise operation."""
+    one, high, edge = np.uint64(1), np.uint64(63), np.uint64((width - 1) % 64)
+    # Neighbors to the west and east, carrying bits between words
+    west = rows << one
+    west[:, 1:] |= rows[:, :-1] >> high
+    east = rows >> one
+    east[:, :-1] |= rows[:, 1:] << high
+    if wrap:
+        west[:, 0] |= (rows[:, -1] >> edge) & one
+        east[:, -1] |= (rows[:, 0] & one) << edge
+    new_rows = life_bits(
+        rows,
+        shift_rows(rows, -1, wrap),
+        shift_rows(rows, 1, wrap),
+        east,
+        west,
+        shift_rows(east, -1, wrap),
+        shift_rows(west, -1, wrap),
+        shift_rows(east, 1, wrap),
+        shift_rows(west, 1, wrap),
+    )
+    new_rows[:, -1] &= last_word_mask(width)
+    return new_rows
+
+
+def update_bits_kernel(
+    rows_in: "np.ndarray", rows_out: "np.ndarray", width: int, wrap: bool
+) -> None:
+    """Same as update_bits_numpy, one word at a time. Compiled with numba."""
+    height, words = rows_in.shape
+    one, high, edge = np.uint64(1), np.uint64(63), np.uint64((width - 1) % 64)
+    mask = last_word_mask(width)
+    last = words - 1
+    blank = np.zeros(words, dtype=np.uint64)
+    # West neighbors, cells and east neighbors of the rows above, at, and below y
+    shifted = np.zeros((3, 3), dtype=np.uint64)
+    for y in range(height):
+        above = rows_in[(y - 1) % height] if wrap or y > 0 else blank
+        below = rows_in[(y + 1) % height] if wrap or y + 1 < height else blank
+        for k in range(words):
+            for i in range(3):
+                row = above if i == 0 else rows_in[y] if i == 1 else below
+                west = row[k] << one
+                east = row[k] >> one
+                if k > 0:
+                    west |= row[k - 1] >> high
+                elif wrap:
+                    west |= (row[last] >> edge) & one
+                if k < last:
+                    east |= row[k + 1] << high
+                elif wrap:
+                    east |= (row[0] & one) << edge
+                shifted[i, 0], shifted[i, 1], shifted[i, 2] = west, row[k], east
+            word = life_bits(
+                shifted[1, 1],
+                shifted[0, 1],
+                shifted[2, 1],
+                shifted[1, 2],
+                shifted[1, 0],
+                shifted[0, 2],
+                shifted[0, 0],
+                shifted[2, 2],
+                shifted[2, 0],
+            )
+            rows_out[y, k] = word & mask if k == last else word
+
+
+if numba is not None:
+    hadd = numba.njit(cache=True)(hadd)
+    fadd = numba.njit(cache=True)(fadd)
+    life_bits = numba.njit(cache=True)(life_bits)
+    last_word_mask = numba.njit(cache=True)(last_word_mask)
+    update_bits_kernel = numba.njit(cache=True)(update_bits_kernel)
+
+
+def update_bits(
+    rows: "np.ndarray",
+    width: int,
+    surface: Surface,
+    out: Optional["np.ndarray"] = None,
+) -> "np.ndarray":
+    """The next generation of a packed board, written into out if it is given."""
+    wrap = surface == "sphere"
+    if out is None:
+        out = np.empty_like(rows)
+    if libgameoflife is not None and rows.flags.c_contiguous and out.flags.c_contiguous:
+        status = libgameoflife.update_bits_u64(
+            rows.ctypes.data, out.ctypes.data, width, rows.shape[0], wrap
+        )
+        if status != 0:
+            raise MemoryError("libgameoflife could not allocate a row")
+    elif numba is not None:
+        update_bits_kernel(rows, out, width, wrap)
+    else:
+        out[...] = update_bits_numpy(rows, width, wrap)
+    return out
+
+
+# One thread per cell, each block of threads shares its cells and their neighbors
+GPU_BLOCK = 16
+LIFE_STEP_CUDA = r"""
+extern "C" __global__ void life_step(const unsigned char *in,
+                                     unsigned char *out,
+                                     int width, int height, int wrap)
+{
+    __shared__ unsigned char tile[BLOCK + 2][BLOCK + 2];
+    int x = blockIdx.x * BLOCK + threadIdx.x;
+    int y = blockIdx.y * BLOCK + threadIdx.y;
+
+    /* Read each cell of the block and its border from global memory once */
+    for (int ty = threadIdx.y; ty < BLOCK + 2; ty += BLOCK) {
+        for (int tx = threadIdx.x; tx < BLOCK + 2; tx += BLOCK) {
+            int cy = blockIdx.y * BLOCK + ty - 1;
+            int cx = blockIdx.x * BLOCK + tx - 1;
+            unsigned char cell = 0;
+            if (wrap) {
+                cell = in[(cy + height) % height * width + (cx + width) % width];
+            } else if (0 <= cy && cy < height && 0 <= cx && cx < width) {
+                cell = in[cy * width + cx];
+            }
+            tile[ty][tx] = cell;
+        }
+    }
+    __syncthreads();
+    if (x >= width || y >= height)
+        return;
+
+    int tx = threadIdx.x + 1, ty = threadIdx.y + 1;
+    int n = tile[ty - 1][tx - 1] + tile[ty - 1][tx] + tile[ty - 1][tx + 1]
+          + tile[ty][tx - 1] + tile[ty][tx + 1]
+          + tile[ty + 1][tx - 1] + tile[ty + 1][tx] + tile[ty + 1][tx + 1];
+    out[y * width + x] = (n == 3) | (tile[ty][tx] & (n == 2));
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def gpu_kernel():
+    import cupy  # pylint: disable=import-outside-toplevel
+
+    return cupy.RawKernel(
+        LIFE_STEP_CUDA, "life_step", options=(f"-DBLOCK={GPU_BLOCK}",)
+    )
+
+
+def update_gpu(board_in, board_out, surface: Surface) -> None:
+    """Like update, for uint8 CuPy arrays in GPU memory."""
+    height, width = board_in.shape
+    grid = (-(-width // GPU_BLOCK), -(-height // GPU_BLOCK))
+    gpu_kernel()(
+        grid,
+        (GPU_BLOCK, GPU_BLOCK),
+        (
+            board_in,
+            board_out,
+            np.int32(width),
+            np.int32(height),
+            np.int32(surface == "sphere"),
+        ),
+    )
+
+
+def live_cells(board: Board) -> Cells:
+    if not isinstance(board, list):
+        ys, xs = np.nonzero(board)
+        return set(zip(ys.tolist(), xs.tolist()))
+    return {(y, x) for y, row in enumerate(board) for x, cell in enumerate(row) if cell}
+
+
+def live_fraction(board: Board) -> float:
+    if not isinstance(board, list):
+        return np.count_nonzero(board) / board.size
+    return sum(map(sum, board)) / sum(map(len, board))
+
+
+def draw(cells: Cells, board: Board) -> None:
+    """Overwrite the board with the live cells."""
+    if not isinstance(board, list):
+        board.fill(DEAD)
+        if cells:
+            ys, xs = zip(*cells)
+            board[ys, xs] = LIVE
+        return
+    for row in board:
+        row[:] = [DEAD] * len(row)
+    for y, x in cells:
+        board[y][x] = LIVE
+
+
+def update_sparse(cells: Cells, width: int, height: int, surface: Surface) -> Cells:
+    """Apply the rules to the live cells and their neighbors only."""
+    neighbor_counts: dict[tuple[int, int], int] = {}
+    wrap = surface == "sphere"
+    for y, x in cells:
+        for dy, dx in NEIGHBOR_OFFSETS:
+            ny, nx = y + dy, x + dx
+            if wrap:
+                ny, nx = ny % height, nx % width
+            elif not (0 <= ny < height and 0 <= nx < width):
+                continue
+            neighbor_counts[ny, nx] = neighbor_counts.get((ny, nx), 0) + 1
+    return {
+        cell
+        for cell, neighbor_count in neighbor_counts.items()
+        if neighbor_count == 3 or (neighbor_count == 2 and cell in cells)
+    }
+
+
+@lru_cache(maxsize=None)
+def cell_bytes(alphabet: tuple[str, str]) -> tuple["np.ndarray", "np.ndarray"]:
+    """The bytes of dead cells, live cells and newlines, indexed by 0, 1 and 2.
+
+    Shorter entries are padded, the second table says which bytes are not padding.
+    """
+    entries = [alphabet[1].encode(), alphabet[0].encode(), b"\n"]
+    size = max(map(len, entries))
+    table = np.zeros((3, size), dtype=np.uint8)
+    used = np.zeros((3, size), dtype=bool)
+    for i, entry in enumerate(entries):
+        table[i, : len(entry)] = list(entry)
+        used[i, : len(entry)] = True
+    return table, used
+
+
+def show_bytes(
+    board: Board, alphabet: tuple[str, str] = (LIVE_STR, DEAD_STR), sep=""
+) -> bytes:
+    if not isinstance(board, list) and not sep:
+        table, used = cell_bytes(alphabet)
+        height, width = board.shape
+        if len(alphabet[0].encode()) == len(alphabet[1].encode()):
+            # Look up every cell at once, then end each row with a newline
+            out = np.empty((height, width * table.shape[1] + 1), dtype=np.uint8)
+            out[:, :-1] = table[board].reshape(height, -1)
+            out[:, -1] = ord("\n")
+            return out.tobytes()[:-1]
+        # Cells of different lengths, drop the padding after looking them up
+        index = np.full((height, width + 1), 2, dtype=np.intp)
+        index[:, :-1] = board
+        index = index.ravel()[:-1]
+        return table[index][used[index]].tobytes()
+    live, dead = (cell.encode() for cell in alphabet)
+    return b"\n".join(
+        sep.encode().join(live if cell else dead for cell in row) for row in board
+    )
 
 
 def show(board: Board, alphabet: tuple[str, str] = (LIVE_STR, DEAD_STR), sep="") -> str:
-    live, dead = alphabet
-    return "\n".join(sep.join(live if cell else dead for cell in row) for row in board)
+    return show_bytes(board, alphabet, sep).decode()
+
+
+@lru_cache(maxsize=None)
+def live_table(live: str) -> Optional[bytes]:
+    """Translates each Latin-1 character to 1 if it is a live cell, otherwise 0.
+
+    None if some live cells are not Latin-1 characters.
+    """
+    if any(ord(cell) > 255 for cell in live):
+        return None
+    return bytes(chr(i) in live for i in range(256))
+
+
+def parse_row(row: str, live: str) -> bytes:
+    """A byte per cell, 1 if it is a live cell."""
+    table = live_table(live)
+    if table is not None:
+        try:
+            return row.encode("latin-1").translate(table)
+        except UnicodeEncodeError:
+            pass
+    # Characters other than Latin-1 ones, one at a time
+    return bytes(cell in live for cell in row)
 
 
 def parse(lines: list[str], live: str = "#@&" + string.ascii_uppercase) -> Board:
-    output: Board = []
-    for row in lines:
-        row = row.strip()
-        if len(row) == 0:
-            continue
-        output.append([LIVE if cell in live else DEAD for cell in row])
-    assert len(output) > 0, f"empty board parsed:\n{lines}"
-    assert all(len(row) > 0 for row in output), f"empty rows found:\n{lines}"
-    return output
-
-
-def pick_updater(source: str, surface: Surface) -> Callable[[Board], Board]:
-    def command(board_str: str) -> list[str]:
+    output = [parse_row(row, live) for row in map(str.strip, lines) if row]
+    if __debug__:
+        assert len(output) > 0, f"empty board parsed:\n{lines}"
+        assert all(len(row) > 0 for row in output), f"empty rows found:\n{lines}"
+    if np is not None:
+        # Pad short rows with dead cells
+        width = max(len(row) for row in output)
+        cells = bytearray(b"".join(row.ljust(width, b"\0") for row in output))
+        return np.frombuffer(cells, dtype=np.uint8).reshape(len(output), width)
+    return [list(map(bool, row)) for row in output]
+
+
+class Worker:
+    """A process that reads boards from stdin and writes each next board to stdout.
+
+    Every board is followed by a line with FRAME_END. The process is started on
+    the first step, and again if it exits.
+    """
+
+    def __init__(self, command: list[str]) -> None:
+        self.command = command
+        self.process: Optional[subprocess.Popen] = None
+
+    def step(self, board_str: str) -> str:
+        for _ in range(2):
+            if self.process is None or self.process.poll() is not None:
+                self.process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                )
+            assert self.process.stdin and self.process.stdout
+            try:
+                self.process.stdin.write(board_str + "\n" + FRAME_END + "\n")
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                continue
+            lines: list[str] = []
+            for line in self.process.stdout:
+                if line.rstrip("\n") == FRAME_END:
+                    return "".join(lines)
+                lines.append(line)
+            # The worker exited before writing the next board, restart it
+            self.process.wait()
+        raise RuntimeError(f"{self.command} exited without writing a board")
+
+
+def pick_updater(source: str, surface: Surface) -> Callable[[Board, Board], Board]:
+    """Updaters may write the next board into the spare board and return it."""
+
+    def command() -> list[str]:
         if source.endswith(".py"):
-            return ["python3", source, board_str]
+            return ["python3", source]
         if source.endswith(".bin"):
-            return [source, board_str]
+            return [source]
         return ["echo", "Unknown source"]
 
-    def external(board: Board) -> Board:
+    def external(board: Board, _spare: Board) -> Board:
         # ignore surface
         encoded_board = show(board, alphabet=("#", "."))
-        output = subprocess.check_output(command(encoded_board)).decode("utf-8")
-        return parse(output.split("\n"))
-
-    def default(board: Board) -> Board:
-        return update(board, surface=surface)
+        return parse(external_step(encoded_board).split("\n"))
+
+    # The live cells of the last board returned by sparse
+    cells: Cells = set()
+    last_board: Optional[Board] = None
+
+    def sparse(board: Board, spare: Board) -> Board:
+        nonlocal cells, last_board
+        if board is not last_board:
+            cells = live_cells(board)
+        cells = update_sparse(cells, len(board[0]), len(board), surface)
+        draw(cells, spare)
+        last_board = spare
+        return spare
+
+    universe: Optional["hashlife_module.Universe"] = None
+    universe_board: Optional[Board] = None
+
+    def hashlife(board: Board, spare: Board) -> Board:
+        # ignore surface, the universe is infinite
+        nonlocal universe, universe_board
+        if board is not universe_board or universe is None:
+            universe = hashlife_module.Universe(
+                live_cells(board), len(board), len(board[0])
+            )
+        universe.step()
+        draw(set(universe.cells()), spare)
+        universe_board = spare
+        return spare
+
+    # The last board returned by gpu and a spare, both in GPU memory
+    device_boards: Optional[tuple["cupy.ndarray", "cupy.ndarray"]] = None
+    device_board: Optional[Board] = None
+
+    def gpu(board: Board, spare: Board) -> Board:
+        nonlocal device_boards, device_board
+        if board is not device_board or device_boards is None:
+            board_in = cupy.asarray(board)
+            device_boards = board_in, cupy.empty_like(board_in)
+        board_in, board_out = device_boards
+        update_gpu(board_in, board_out, surface)
+        device_boards = board_out, board_in
+        # Only copy the board back to be displayed
+        board_out.get(out=spare)
+        device_board = spare
+        return spare
+
+    row_cache = RowCache()
+    boards = 0
+
+    def default(board: Board, spare: Board) -> Board:
+        nonlocal row_cache, boards, last_board
+        if not isinstance(board, list):
+            update(board, spare, surface=surface)
+            return spare
+        if live_fraction(board) < SPARSE_FRACTION:
+            return sparse(board, spare)
+        # The sparse cells are out of date once this board is overwritten
+        last_board = None
+        boards += 1
+        rows = len(row_cache.ids) + len(row_cache.next_rows)
+        # A pointer per cell of each row and of each next row
+        if boards % ROW_CACHE_BOARDS == 0 or 8 * rows * len(board[0]) > MEMO_BYTES:
+            row_cache = RowCache()
+        update(board, spare, surface=surface, row_cache=row_cache)
+        return spare
+
+    # The packed rows of the last board returned by bitboard, and spare rows
+    packed_rows: Optional[tuple["np.ndarray", "np.ndarray"]] = None
+    packed_board: Optional[Board] = None
+
+    def bitboard(board: Board, spare: Board) -> Board:
+        nonlocal packed_rows, packed_board
+        # Only picked when numpy is installed
+        assert not isinstance(board, list) and not isinstance(spare, list)
+        width = board.shape[1]
+        if board is not packed_board or packed_rows is None:
+            rows = pack(board)
+            packed_rows = rows, np.empty_like(rows)
+        rows, new_rows = packed_rows
+        update_bits(rows, width, surface, out=new_rows)
+        packed_rows = new_rows, rows
+        # Only unpack the board to be displayed
+        spare[...] = unpack(new_rows, width)
+        packed_board = spare
+        return spare
 
     if source.startswith("./variants"):
         print("Using external script", source)
+        external_step = Worker(command()).step
+        if source.endswith(".py"):
+            # Call the script in this process if it can be imported
+            spec = importlib.util.spec_from_file_location("variant", source)
+            if spec and spec.loader:
+                variant = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(variant)
+                external_step = getattr(variant, "step", external_step)
         return external
+    if source == "sparse":
+        return sparse
+    if source == "hashlife":
+        import hashlife as hashlife_module  # pylint: disable=import-outside-toplevel
+
+        return hashlife
+    if source == "gpu":
+        try:
+            import cupy  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            cupy = None
+        if cupy is not None and np is not None:
+            return gpu
+        print("The gpu source needs cupy, using python")
+    if source == "bitboard":
+        if np is not None:
+            return bitboard
+        print("The bitboard source needs numpy, using python")
     return default
 
 
+def memoize(
+    update_function: Callable[[Board, Board], Board], size: int
+) -> Callable[[Board, Board], Board]:
+    """Skip the update of repeating boards, like still lifes and oscillators.
+
+    Only boards whose checksum is among the last size boards are remembered.
+    """
+    cache: dict[bytes, Board] = {}
+    recent: collections.deque[int] = collections.deque(maxlen=size)
+
+    def memoized(board: Board, spare: Board) -> Board:
+        key: Optional[bytes] = None
+        if not isinstance(board, list):
+            checksum = zlib.crc32(np.ascontiguousarray(board).data)
+        else:
+            key = b"".join(map(bytes, board))
+            checksum = hash(key)
+        repeated = checksum in recent
+        recent.append(checksum)
+        if not repeated:
+            return update_function(board, spare)
+        if key is None:
+            assert not isinstance(board, list)
+            key = board.tobytes()
+        next_board = cache.get(key)
+        if next_board is None:
+            next_board = update_function(board, spare)
+            if len(cache) >= size:
+                # Forget the oldest board
+                del cache[next(iter(cache))]
+            cache[key] = copy(next_board)
+            return next_board
+        # The cached board must not be overwritten later. Copy it into a new board
+        # rather than the spare, which may be the last board the updater returned
+        # and would then look unchanged to updaters that remember it
+        return copy(next_board)
+
+    return memoized
+
+
 class Display(abc.ABC):
     @abc.abstractmethod
     def display(self, board: Board, iteration: int, args: OutputArgs) -> None:
@@ -241,8 +963,11 @@ class NeoPixel(Display):
 
 class CLI(Display):
     current_color = 0
+    last_frame = b""
     clear = "\033[2J"
     to_top = "\033[H"
+    clear_line = "\033[K"
+    status_up = "\r\033[A"
     black_on_white = "\x1b[1;30;47m"
     reset_color = "\x1b[0m"
     colors: list[tuple[str, str]] = [
@@ -265,14 +990,10 @@ class CLI(Display):
         
         setcolor = args.get("color")
 
-        if iteration > 1:
-            if setcolor:
-                print(CLI.reset_color, CLI.clear, end=CLI.to_top)
-            time.sleep(args.get("delay", 1.0))
-
         # Display
+        frame = []
         if setcolor and setcolor in CLI.colors_dict:
-            print(CLI.colors_dict.get(setcolor), end="")
+            frame.append(CLI.colors_dict[setcolor].encode())
         if setcolor == "dynamic":
             live, dead = alphabet
             out = "\n".join(
@@ -287,17 +1008,55 @@ class CLI(Display):
                 )
                 for y, row in enumerate(board)
             )
-            print(out)
+            frame.append(out.encode())
         else:
-            print(show(board, alphabet))
-        if all(not cell for row in board for cell in row):
-            print("empty board")
+            frame.append(show_bytes(board, alphabet))
+        frame.append(b"\n")
+        if not isinstance(board, list):
+            alive = bool(board.any())
+        else:
+            alive = any(map(any, board))
+        if not alive:
+            frame.append(b"empty board\n")
+        board_frame = b"".join(frame)
 
         self.current_color += 1
-        
+
+        status = ""
         if setcolor:
-            print(CLI.reset_color + CLI.black_on_white, end="")
-        print(f"The Game of Life. {iteration} steps.", args.get("name", ""), args.get("source", ""))
+            status = CLI.reset_color + CLI.black_on_white
+        status += " ".join(
+            (
+                f"The Game of Life. {iteration} steps.",
+                args.get("name", ""),
+                args.get("source", ""),
+            )
+        )
+        status_line = (status + "\n").encode()
+
+        if iteration > 1:
+            time.sleep(args.get("delay", 1.0))
+        # Write each frame at once, and only the status line if the board is the same
+        if iteration > 1 and setcolor:
+            if board_frame == self.last_frame:
+                # Back to the start of the status line, which may have scrolled, and
+                # clear it before the status colors are set
+                status_up = CLI.status_up + CLI.reset_color + CLI.clear_line
+                self.write((status_up + status + "\n").encode())
+            else:
+                clear = CLI.reset_color + CLI.clear + CLI.to_top
+                self.write(clear.encode() + board_frame + status_line)
+            # This frame starts at the top of the screen
+            self.last_frame = board_frame
+        else:
+            self.write(board_frame + status_line)
+
+    @staticmethod
+    def write(data: bytes) -> None:
+        sys.stdout.flush()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(sys.stdout.fileno(), view) :]
 
 
 def loop(
@@ -318,11 +1077,30 @@ def loop(
     if max_iterations == 0:
         display(board, iteration, args)
 
-    update_function = pick_updater(args.get("source", "unknown"), surface)
+    source = args.get("source", "unknown")
+    update_function = pick_updater(source, surface)
+    # A byte per cell of a key, and a byte per cell of a NumPy board or a
+    # pointer per cell of a list board
+    bytes_per_cell = 2 if not isinstance(board, list) else 9
+    memo_size = min(
+        MEMO_SIZE, MEMO_BYTES // (bytes_per_cell * len(board) * len(board[0]))
+    )
+    # Compiled kernels and GPUs step a NumPy board faster than it is checked for
+    # repeats. HashLife shows part of an infinite board, and the next part also
+    # depends on the cells that are not shown.
+    fast = source == "gpu" or (
+        not isinstance(board, list)
+        and not source.startswith("./variants")
+        and (libgameoflife is not None or numba is not None)
+    )
+    if memo_size > 0 and not fast and source != "hashlife":
+        update_function = memoize(update_function, memo_size)
 
+    # Two boards, the one on display and a spare to write the next one into
+    spare = copy(board)
     while iteration < max_iterations:
         # Update
-        board = update_function(board)
+        board, spare = update_function(board, spare), board
 
         iteration += 1
         display(board, iteration, args)
@@ -380,7 +1158,16 @@ def main() -> None:
     )
     parser.add_argument(
         "--source",
-        choices=["python", "./variants/golf.py"],
+        choices=[
+            "python",
+            "bitboard",
+            "sparse",
+            "hashlife",
+            "gpu",
+            "./variants/golf.py",
+        ],
+        help="hashlife always simulates an infinite surface. "
+        "gpu needs cupy and a CUDA GPU, and pays off for very large boards.",
         default="python",
     )
     parser.add_argument("--name", default="")
@@ -0,0 +1,231 @@
+"""HashLife, the Game of Life on an infinite board stored as a quadtree.
+
+Identical squares of cells are the same Node, and each Node remembers its next
+generation, so repeated patterns and still lifes are only computed once.
+"""
+import collections
+import weakref
+from functools import lru_cache
+from typing import Iterable, Optional, cast
+
+# pylint: disable=missing-class-docstring, missing-function-docstring, invalid-name
+
+# Keep recent boards alive, and with them the next generation of their squares
+HISTORY = 64
+
+
+class Node:
+    """A square of 2**level by 2**level cells."""
+
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population", "next", "__weakref__")
+
+    def __init__(
+        self,
+        nw: "Node",
+        ne: "Node",
+        sw: "Node",
+        se: "Node",
+        level: int,
+        population: int,
+    ) -> None:
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.level = level
+        self.population = population
+        # The center square, one generation later
+        self.next: Optional[Node] = None
+
+
+# The children of single cells, which are never read
+NO_CHILD = cast(Node, None)
+DEAD_LEAF = Node(NO_CHILD, NO_CHILD, NO_CHILD, NO_CHILD, 0, 0)
+LIVE_LEAF = Node(NO_CHILD, NO_CHILD, NO_CHILD, NO_CHILD, 0, 1)
+
+# Children are kept alive by their parent, so their ids are not reused while
+# the parent is in the table
+nodes: "weakref.WeakValueDictionary[tuple[int, int, int, int], Node]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def join(nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+    key = (id(nw), id(ne), id(sw), id(se))
+    node = nodes.get(key)
+    if node is None:
+        population = nw.population + ne.population + sw.population + se.population
+        node = Node(nw, ne, sw, se, nw.level + 1, population)
+        nodes[key] = node
+    return node
+
+
+@lru_cache(maxsize=None)
+def empty(level: int) -> Node:
+    if level == 0:
+        return DEAD_LEAF
+    child = empty(level - 1)
+    return join(child, child, child, child)
+
+
+def center(node: Node) -> Node:
+    return join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+
+def expand(node: Node) -> Node:
+    """The same cells in the center of a square twice as wide."""
+    border = empty(node.level - 1)
+    return join(
+        join(border, border, border, node.nw),
+        join(border, border, node.ne, border),
+        join(border, node.sw, border, border),
+        join(node.se, border, border, border),
+    )
+
+
+def neighbor_mask(y: int, x: int) -> int:
+    """The bits of the neighbors of cell (y, x) of a 4x4 square, see life_rule_4x4."""
+    return sum(
+        1 << (4 * (y + dy) + x + dx)
+        for dy in (-1, 0, 1)
+        for dx in (-1, 0, 1)
+        if dy or dx
+    )
+
+
+CENTER_4X4 = [(y, x, neighbor_mask(y, x)) for y in (1, 2) for x in (1, 2)]
+
+
+def life_rule_4x4(bits: int) -> int:
+    """The center 2x2 cells of a 4x4 square one generation later.
+
+    Cell (y, x) is bit 4 * y + x of both the square and the result.
+    """
+    result = 0
+    for y, x, mask in CENTER_4X4:
+        neighbors = (bits & mask).bit_count()
+        if neighbors == 3 or (neighbors == 2 and bits >> (4 * y + x) & 1):
+            result |= 1 << (4 * y + x)
+    return result
+
+
+LIFE_RULE_4X4 = [life_rule_4x4(bits) for bits in range(1 << 16)]
+
+
+def cell_bits(node: Node, y: int = 0, x: int = 0) -> int:
+    """The cells of a square of at most 4x4 as bits, see life_rule_4x4."""
+    if node.level == 0:
+        return node.population << (4 * y + x)
+    half = 1 << (node.level - 1)
+    return (
+        cell_bits(node.nw, y, x)
+        | cell_bits(node.ne, y, x + half)
+        | cell_bits(node.sw, y + half, x)
+        | cell_bits(node.se, y + half, x + half)
+    )
+
+
+def leaf(bits: int, y: int, x: int) -> Node:
+    return LIVE_LEAF if bits >> (4 * y + x) & 1 else DEAD_LEAF
+
+
+def next_generation(node: Node) -> Node:
+    """The center square of a square of level 2 or more, one generation later."""
+    if node.next is not None:
+        return node.next
+    if node.population == 0:
+        result = node.nw
+    elif node.level == 2:
+        bits = LIFE_RULE_4X4[cell_bits(node)]
+        result = join(
+            leaf(bits, 1, 1), leaf(bits, 1, 2), leaf(bits, 2, 1), leaf(bits, 2, 2)
+        )
+    else:
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        # Nine overlapping squares of half the size, and their next centers
+        n00, n01, n02 = nw, join(nw.ne, ne.nw, nw.se, ne.sw), ne
+        n10 = join(nw.sw, nw.se, sw.nw, sw.ne)
+        n11 = center(node)
+        n12 = join(ne.sw, ne.se, se.nw, se.ne)
+        n20, n21, n22 = sw, join(sw.ne, se.nw, sw.se, se.sw), se
+        c00, c01, c02 = map(next_generation, (n00, n01, n02))
+        c10, c11, c12 = map(next_generation, (n10, n11, n12))
+        c20, c21, c22 = map(next_generation, (n20, n21, n22))
+        result = join(
+            center(join(c00, c01, c10, c11)),
+            center(join(c01, c02, c11, c12)),
+            center(join(c10, c11, c20, c21)),
+            center(join(c11, c12, c21, c22)),
+        )
+    node.next = result
+    return result
+
+
+def build(cells: list[tuple[int, int]], level: int, top: int, left: int) -> Node:
+    if not cells:
+        return empty(level)
+    if level == 0:
+        return LIVE_LEAF
+    half = 1 << (level - 1)
+    quadrants: list[list[tuple[int, int]]] = [[], [], [], []]
+    for y, x in cells:
+        quadrants[2 * (y >= top + half) + (x >= left + half)].append((y, x))
+    nw, ne, sw, se = quadrants
+    return join(
+        build(nw, level - 1, top, left),
+        build(ne, level - 1, top, left + half),
+        build(sw, level - 1, top + half, left),
+        build(se, level - 1, top + half, left + half),
+    )
+
+
+class Universe:
+    """An infinite board, of which the cells of a height by width board are shown."""
+
+    def __init__(self, cells: Iterable[tuple[int, int]], height: int, width: int):
+        self.height, self.width = height, width
+        level = max(3, (max(height, width) - 1).bit_length())
+        # The root covers the square from (top, left) of 2**level cells
+        self.top = self.left = 0
+        self.root = build(list(cells), level, self.top, self.left)
+        self.history: collections.deque[Node] = collections.deque(maxlen=HISTORY)
+
+    def step(self) -> None:
+        root = self.root
+        # Grow until no cell can be born outside of the next center square
+        while (
+            root.level < 3
+            or root.nw.population != root.nw.se.se.population
+            or root.ne.population != root.ne.sw.sw.population
+            or root.sw.population != root.sw.ne.ne.population
+            or root.se.population != root.se.nw.nw.population
+        ):
+            quarter = 1 << (root.level - 1)
+            root = expand(root)
+            self.top, self.left = self.top - quarter, self.left - quarter
+        self.history.append(root)
+        quarter = 1 << (root.level - 2)
+        self.root = next_generation(root)
+        self.top, self.left = self.top + quarter, self.left + quarter
+
+    def cells(self) -> list[tuple[int, int]]:
+        """The live cells that are shown."""
+        found: list[tuple[int, int]] = []
+        self._find(self.root, self.top, self.left, found)
+        return found
+
+    def _find(self, node: Node, top: int, left: int, found: list) -> None:
+        size = 1 << node.level
+        if (
+            node.population == 0
+            or top >= self.height
+            or left >= self.width
+            or top + size <= 0
+            or left + size <= 0
+        ):
+            return
+        if node.level == 0:
+            found.append((top, left))
+            return
+        half = size // 2
+        self._find(node.nw, top, left, found)
+        self._find(node.ne, top, left + half, found)
+        self._find(node.sw, top + half, left, found)
+        self._find(node.se, top + half, left + half, found)
@@ -8,7 +8,11 @@ set -ex
 BIN="${BIN:-/usr/bin/}"
 DATA="${DATA:-/usr/share/gameoflife}"
 
-cp gameoflife.py gameoflife_screensaver "$BIN"
+cp gameoflife.py hashlife.py gameoflife_screensaver "$BIN"
 mkdir -p "$DATA"
 cp -r samples/*.txt "$DATA"
+# Optional, gameoflife.py falls back to numpy without it
+if cc -O3 -shared -fPIC -o "$DATA/libgameoflife.so" gameoflife.c; then
+  sed -i "s#^LIBRARY = .*#LIBRARY = \"$DATA/libgameoflife.so\"#" "$BIN/gameoflife.py"
+fi
 sed -i "s#samples#$DATA#" "$BIN/gameoflife_screensaver"
@@ -0,0 +1,59 @@
+"""The memo of repeating boards against the plain updaters."""
+import pytest
+
+import gameoflife
+
+# pylint: disable=missing-function-docstring
+
+STEPS = 20
+
+# A blinker, which repeats every two steps, next to a block, which never changes
+BOARD = [
+    "..........",
+    "..#.......",
+    "..#...##..",
+    "..#...##..",
+    "..........",
+]
+
+
+def run(update_function):
+    board = gameoflife.parse(BOARD)
+    spare = gameoflife.copy(board)
+    boards = []
+    for _ in range(STEPS):
+        board, spare = update_function(board, spare), board
+        boards.append(gameoflife.show(board))
+    return boards
+
+
+@pytest.mark.parametrize("source", ["python", "sparse"])
+def test_memoize(source, monkeypatch):
+    monkeypatch.setattr(gameoflife, "np", None)
+    expected = run(gameoflife.pick_updater(source, "rectangle"))
+    plain = gameoflife.pick_updater(source, "rectangle")
+    updates = 0
+
+    def counted(board, spare):
+        nonlocal updates
+        updates += 1
+        return plain(board, spare)
+
+    memoized = gameoflife.memoize(counted, gameoflife.MEMO_SIZE)
+    assert run(memoized) == expected
+    # Each phase is updated when it is first seen, and again when it repeats
+    assert updates == 4
+
+
+def test_loop_does_not_memoize_hashlife(monkeypatch):
+    # NumPy boards are not memoized with a compiled kernel either
+    monkeypatch.setattr(gameoflife, "np", None)
+    memoized = []
+    monkeypatch.setattr(
+        gameoflife, "memoize", lambda *args: memoized.append(args) or args[0]
+    )
+    board = gameoflife.parse(BOARD)
+    gameoflife.loop(board, 3, args={"source": "hashlife", "delay": 0, "color": ""})
+    assert not memoized
+    gameoflife.loop(board, 3, args={"source": "python", "delay": 0, "color": ""})
+    assert memoized
@@ -0,0 +1,40 @@
+"""Parsing boards against a plain check of each character."""
+import pytest
+
+import gameoflife
+
+# pylint: disable=missing-function-docstring
+
+np = gameoflife.np
+
+
+@pytest.fixture(params=["list", "array"])
+def parse(request, monkeypatch):
+    if request.param == "list":
+        monkeypatch.setattr(gameoflife, "np", None)
+    elif np is None:
+        pytest.skip("numpy is not available")
+
+    def parse_lists(lines, **kwargs):
+        return [
+            [int(cell) for cell in row] for row in gameoflife.parse(lines, **kwargs)
+        ]
+
+    return parse_lists
+
+
+def test_parse(parse):
+    # Blank lines and the whitespace around rows are skipped
+    lines = ["#..#", " .##.\n", "", "#.A@"]
+    assert parse(lines) == [[1, 0, 0, 1], [0, 1, 1, 0], [1, 0, 1, 1]]
+
+
+def test_parse_live_outside_latin_1(parse):
+    assert parse(["█#"], live="█") == [[1, 0]]
+    assert parse(["█▒", "▒█"], live="#▒") == [[0, 1], [1, 0]]
+
+
+def test_parse_cells_outside_latin_1(parse):
+    # Characters that are not in the translation table are not live cells
+    assert parse(["?█é"], live="?") == [[1, 0, 0]]
+    assert parse(["#█.", "é#?"]) == [[1, 0, 0], [0, 1, 0]]
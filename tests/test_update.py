@@ -0,0 +1,176 @@
+"""Every updater against a plain implementation of the rules."""
+import random
+
+import pytest
+
+import gameoflife
+import hashlife
+
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+np = gameoflife.np
+
+# Widths around the 16 and 32 cells of an SSE2 and AVX2 vector, the 64 cells
+# of a packed word, and wider boards that end in a partial vector
+WIDTHS = [1, 2, 3, 15, 16, 17, 31, 32, 33, 63, 64, 65, 100, 321, 449, 1000]
+HEIGHTS = [1, 2, 3, 7]
+SURFACES = ["sphere", "rectangle"]
+STEPS = 3
+
+
+def reference(board: list[list[int]], surface: str) -> list[list[int]]:
+    height, width = len(board), len(board[0])
+
+    def cell(y: int, x: int) -> int:
+        if surface == "sphere":
+            return board[y % height][x % width]
+        return board[y][x] if 0 <= y < height and 0 <= x < width else 0
+
+    new_board = []
+    for y in range(height):
+        new_row = []
+        for x in range(width):
+            count = sum(
+                cell(y + dy, x + dx)
+                for dy in (-1, 0, 1)
+                for dx in (-1, 0, 1)
+                if dy or dx
+            )
+            new_row.append(int(count == 3 or count == 2 and board[y][x]))
+        new_board.append(new_row)
+    return new_board
+
+
+def random_board(height: int, width: int) -> list[list[int]]:
+    rng = random.Random(height * 10007 + width)
+    return [[int(rng.random() < 0.35) for _ in range(width)] for _ in range(height)]
+
+
+def as_lists(board) -> list[list[int]]:
+    return [[int(cell) for cell in row] for row in board]
+
+
+def step_list(board, surface):
+    new_board = gameoflife.empty(len(board[0]), len(board))
+    gameoflife.update(board, new_board, surface)
+    return new_board
+
+
+# Rows seen by step_rows on each surface, shared between tests to find some
+ROW_CACHES: dict[str, "gameoflife.RowCache"] = {}
+
+
+def step_rows(board, surface):
+    row_cache = ROW_CACHES.setdefault(surface, gameoflife.RowCache())
+    new_board = gameoflife.empty(len(board[0]), len(board))
+    gameoflife.update(board, new_board, surface, row_cache=row_cache)
+    return new_board
+
+
+def step_array(board, surface):
+    new_board = np.empty_like(board)
+    gameoflife.update(board, new_board, surface)
+    return new_board
+
+
+def step_bits(board, surface):
+    width = board.shape[1]
+    return gameoflife.unpack(
+        gameoflife.update_bits(gameoflife.pack(board), width, surface), width
+    )
+
+
+def step_sparse(board, surface):
+    cells = gameoflife.update_sparse(
+        gameoflife.live_cells(board), len(board[0]), len(board), surface
+    )
+    new_board = gameoflife.empty(len(board[0]), len(board))
+    gameoflife.draw(cells, new_board)
+    return new_board
+
+
+# Each updater, the board type it takes, and what it needs
+UPDATERS = {
+    "python": (step_list, "list", ()),
+    "python rows": (step_rows, "list", ()),
+    "sparse": (step_sparse, "list", ()),
+    "c": (step_array, "array", ("numpy", "library")),
+    "numba": (step_array, "array", ("numpy", "numba")),
+    "numpy": (step_array, "array", ("numpy",)),
+    "bits c": (step_bits, "array", ("numpy", "library")),
+    "bits numba": (step_bits, "array", ("numpy", "numba")),
+    "bits numpy": (step_bits, "array", ("numpy",)),
+}
+
+
+@pytest.fixture(params=list(UPDATERS))
+def updater(request, monkeypatch):
+    step, board_type, needs = UPDATERS[request.param]
+    available = {
+        "numpy": np is not None,
+        "numba": gameoflife.numba is not None,
+        "library": gameoflife.libgameoflife is not None,
+    }
+    for need in needs:
+        if not available[need]:
+            pytest.skip(f"{need} is not available")
+    # Use the slowest implementation that is not skipped
+    if "library" not in needs:
+        monkeypatch.setattr(gameoflife, "libgameoflife", None)
+    if "numba" not in needs:
+        monkeypatch.setattr(gameoflife, "numba", None)
+    if board_type == "list":
+        monkeypatch.setattr(gameoflife, "np", None)
+        return step, lambda board: [[bool(cell) for cell in row] for row in board]
+    return step, lambda board: np.array(board, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("surface", SURFACES)
+@pytest.mark.parametrize("height", HEIGHTS)
+@pytest.mark.parametrize("width", WIDTHS)
+def test_update(updater, surface, height, width):
+    step, make_board = updater
+    expected = random_board(height, width)
+    board = make_board(expected)
+    for _ in range(STEPS):
+        expected = reference(expected, surface)
+        board = step(board, surface)
+        assert as_lists(board) == expected
+
+
+@pytest.mark.skipif(np is None, reason="numpy is not available")
+@pytest.mark.parametrize("surface", SURFACES)
+def test_numpy_bands(surface, monkeypatch):
+    # Bands of two rows, and a last band of one row
+    monkeypatch.setattr(gameoflife, "NUMPY_BAND_CELLS", 70)
+    monkeypatch.setattr(gameoflife, "libgameoflife", None)
+    monkeypatch.setattr(gameoflife, "numba", None)
+    expected = random_board(7, 33)
+    board = np.array(expected, dtype=np.uint8)
+    for _ in range(STEPS):
+        expected = reference(expected, surface)
+        board = step_array(board, surface)
+        assert as_lists(board) == expected
+
+
+@pytest.mark.parametrize("width", [1, 5, 33, 70])
+def test_hashlife(width):
+    # Far enough from the edges that a rectangle is the same as an infinite board
+    margin = 2 * STEPS
+    inner = random_board(6, width)
+    expected = [[0] * (width + 2 * margin) for _ in range(margin)]
+    expected += [[0] * margin + row + [0] * margin for row in inner]
+    expected += [[0] * (width + 2 * margin) for _ in range(margin)]
+    cells = {
+        (y, x) for y, row in enumerate(expected) for x, cell in enumerate(row) if cell
+    }
+    universe = hashlife.Universe(cells, len(expected), len(expected[0]))
+    for _ in range(STEPS):
+        expected = reference(expected, "rectangle")
+        universe.step()
+        assert set(universe.cells()) == {
+            (y, x)
+            for y, row in enumerate(expected)
+            for x, cell in enumerate(row)
+            if cell
+        }
@@ -13,26 +13,58 @@ The universe of the Game of Life is a grid of square cells, each of which is eit
 Given a 32×32 grid, output the state in the next step. Assume that every cell outside the grid is dead. 
 
 
-This file contains a well-formatted versin of my original solution (236 bytes):
+My original solution (236 bytes):
 
 import sys;B=sys.argv[1].replace('\n','')
 X=lambda x:0<=x<1024 and B[x]
 for i in range(1024):
  N=[X(i-32),X(i+32),X(i-1),X(i+1),X(i+31),X(i-33),X(i+33),X(i-31)].count("#");print(N==3 and"#"or N==2 and B[i]or".",end=i%32==31 and"\n"or"")
+
+step() implements the same rules on a padded string, so that neighbors need no
+bounds checks.
+
+Run with a board as the argument to print the next board. Without arguments,
+read boards from stdin and write each next board to stdout, each board followed
+by a line with FRAME_END. gameoflife.py imports step instead.
 """
 import sys
 
-B = sys.argv[1].replace("\n", "")
-X = lambda x: 0 <= x < 1024 and B[x]
-for i in range(1024):
-    N = [
-        X(i - 32),
-        X(i + 32),
-        X(i - 1),
-        X(i + 1),
-        X(i + 31),
-        X(i - 33),
-        X(i + 33),
-        X(i - 31),
-    ].count("#")
-    print(N == 3 and "#" or N == 2 and B[i] or ".", end=i % 32 == 31 and "\n" or "")
+FRAME_END = "---"
+
+
+def step(board: str) -> str:
+    # Dead cells after each row and dead rows around the board, so that no
+    # neighbor is out of bounds or on the other side of the board
+    B = "." * 33 + "".join(row + "." for row in board.split()) + "." * 33
+    A = [cell == "#" for cell in B]
+    out = []
+    for i in range(33, 33 * 33):
+        if i % 33 == 32:
+            out.append("\n")
+            continue
+        N = (
+            A[i - 34]
+            + A[i - 33]
+            + A[i - 32]
+            + A[i - 1]
+            + A[i + 1]
+            + A[i + 32]
+            + A[i + 33]
+            + A[i + 34]
+        )
+        out.append(N == 3 and "#" or N == 2 and B[i] or ".")
+    return "".join(out)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(step(sys.argv[1]), end="")
+    else:
+        lines = []
+        for line in sys.stdin:
+            if line.rstrip("\n") != FRAME_END:
+                lines.append(line)
+                continue
+            sys.stdout.write(step("".join(lines)) + FRAME_END + "\n")
+            sys.stdout.flush()
+            lines = []